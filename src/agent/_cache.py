@@ -0,0 +1,7 @@
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
+
+# Shared exact-prompt LLM cache for all agents. Re-running the same
+# analysis or Q&A prompt returns instantly from SQLite instead of
+# paying another Groq round-trip.
+set_llm_cache(SQLiteCache(database_path=".langchain_cache.db"))
@@ -11,21 +11,30 @@ load_dotenv()
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from src.agent import _cache  # noqa: F401 - enables shared LLM cache
 from src.data.lakehouse import CreditLakehouse
 import duckdb
 
 class LakehouseQAAgent:
     """Q&A Agent using LangChain + Groq"""
     
-    def __init__(self, model="llama-3.3-70b-versatile"):
+    def __init__(self, model="llama-3.3-70b-versatile", sql_model="llama-3.1-8b-instant"):
         """Initialize with LangChain"""
-        self.llm = ChatGroq(
+        # SQL generation is a trivial structured task - route it to the
+        # faster 8b model and keep the 70b for the analytical answer
+        self.sql_llm = ChatGroq(
+            temperature=0,
+            model_name=sql_model,
+            groq_api_key=os.getenv("GROQ_API_KEY")
+        )
+        self.answer_llm = ChatGroq(
             temperature=0,
             model_name=model,
             groq_api_key=os.getenv("GROQ_API_KEY")
         )
         self.lakehouse = CreditLakehouse()
-        
+        self._con = None
+
         # SQL generation prompt
         self.sql_prompt = ChatPromptTemplate.from_messages([
             ("system", "You are a SQL expert. Generate DuckDB queries. Return ONLY the SQL, no explanations."),
@@ -39,49 +48,65 @@ class LakehouseQAAgent:
         ])
         
         # Create chains
-        self.sql_chain = self.sql_prompt | self.llm | StrOutputParser()
-        self.answer_chain = self.answer_prompt | self.llm | StrOutputParser()
+        self.sql_chain = self.sql_prompt | self.sql_llm | StrOutputParser()
+        self.answer_chain = self.answer_prompt | self.answer_llm | StrOutputParser()
         
         print("Lakehouse Q&A Agent (LangChain + Groq) loaded\n")
-    
+
+    def _get_connection(self):
+        """DuckDB connection with a `df` view over the Delta table
+
+        Queries run directly against the Parquet files with predicate
+        pushdown, instead of materializing the whole lakehouse in pandas.
+        """
+        if self._con is None:
+            self._con = duckdb.connect()
+            self._con.execute("INSTALL delta; LOAD delta;")
+            self._con.execute(
+                f"CREATE VIEW df AS SELECT * FROM delta_scan('{self.lakehouse.lakehouse_path}')"
+            )
+        return self._con
+
     def answer_question(self, question: str) -> str:
         """Answer using LangChain chains"""
-        
+
         print(f"Question: {question}\n")
-        
-        df = self.lakehouse.read_all()
-        
-        if df.empty:
+
+        con = self._get_connection()
+
+        # Tiny sample for the prompt; the real query runs in DuckDB
+        sample = con.execute("SELECT * FROM df LIMIT 2").df()
+
+        if sample.empty:
             return "No data in lakehouse."
-        
-        print("Step 1/3: Loading lakehouse data...")
-        print(f"  Found {len(df)} analyses\n")
-        
+
+        print("Step 1/3: Loading lakehouse schema...\n")
+
         # Generate SQL
         print("Step 2/3: Generating SQL query...")
-        
+
         sql_prompt_text = f"""Generate DuckDB SQL query for this question.
 
 Question: {question}
 
 Table: df
-Columns: {', '.join(df.columns.tolist())}
+Columns: {', '.join(sample.columns.tolist())}
 
 Sample:
-{df.head(2).to_string()}
+{sample.to_string()}
 
 Return ONLY SQL query."""
 
         sql_query = self.sql_chain.invoke({"prompt": sql_prompt_text})
-        
+
         # Clean SQL
         sql_query = sql_query.strip().replace("```sql", "").replace("```", "").strip()
         print(f"  SQL: {sql_query}\n")
-        
+
         # Execute
         print("Step 3/3: Executing query...")
         try:
-            result = duckdb.query(sql_query).df()
+            result = con.execute(sql_query).df()
             print(f"  Retrieved {len(result)} rows\n")
         except Exception as e:
             return f"Query failed: {str(e)}"
@@ -96,19 +121,26 @@ Result:
 
 Provide clear, conversational answer."""
 
-        answer = self.answer_chain.invoke({"prompt": answer_prompt_text})
-        
+        # Stream the answer as it is generated
         print("="*70)
         print("ANSWER:")
         print("="*70)
-        print(answer)
+
+        pieces = []
+        for token in self.answer_chain.stream({"prompt": answer_prompt_text}):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+            pieces.append(token)
+        answer = "".join(pieces)
+
+        print()
         print("="*70)
         
         return answer
     
     def show_available_data(self):
         """Show lakehouse contents"""
-        df = self.lakehouse.read_all()
+        df = self.lakehouse.read_all_cached()
         
         print("="*70)
         print("LAKEHOUSE DATA")
@@ -10,6 +10,7 @@ load_dotenv()
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from src.agent import _cache  # noqa: F401 - enables shared LLM cache
 from src.data.rag_system import CreditRAGSystem
 
 class PeerComparisonAgent:
@@ -18,7 +19,7 @@ class PeerComparisonAgent:
     def __init__(self, model="llama-3.3-70b-versatile"):
         """Initialize with LangChain"""
         self.llm = ChatGroq(
-            temperature=0.1,
+            temperature=0,  # deterministic so cache hits match
             model_name=model,
             groq_api_key=os.getenv("GROQ_API_KEY")
         )
@@ -44,31 +45,35 @@ class PeerComparisonAgent:
         print(f"Companies: {', '.join(tickers)}")
         print(f"{'='*70}\n")
         
-        # Collect data
-        company_data = {}
-        
-        for ticker in tickers:
-            print(f"Gathering data for {ticker}...")
-            
-            debt_results = self.rag.get_debt_discussion(ticker, n_results=2)
-            financial_results = self.rag.get_financial_performance(ticker, n_results=2)
-            risk_results = self.rag.get_risk_factors(ticker, n_results=2)
-            
-            company_data[ticker] = {
-                "debt": "\n".join(debt_results["documents"][:1]),
-                "financial": "\n".join(financial_results["documents"][:1]),
-                "risk": "\n".join(risk_results["documents"][:1])
+        # Collect data for all companies in one batched ChromaDB query
+        # instead of 3 separate queries per ticker
+        print("Gathering 10-K context for all companies...")
+
+        queries = {
+            "debt": "debt obligations borrowings liquidity capital structure financing",
+            "financial": "revenue earnings profit loss performance results operations financial condition",
+            "risk": "risk factors business risks financial risks market risks operational risks"
+        }
+        buckets = self.rag.batch_retrieve(queries, tickers, n_results=2)
+
+        company_data = {
+            ticker: {
+                "debt": "\n".join(buckets[ticker]["debt"][:1]),
+                "financial": "\n".join(buckets[ticker]["financial"][:1]),
+                "risk": "\n".join(buckets[ticker]["risk"][:1])
             }
-        
+            for ticker in tickers
+        }
+
         print("\nGenerating comparative analysis...\n")
         
         # Build comparison text
         comparison_text = ""
         for ticker, data in company_data.items():
             comparison_text += f"\n{'='*50}\n{ticker}:\n{'='*50}\n"
-            comparison_text += f"DEBT: {data['debt'][:800]}\n\n"
-            comparison_text += f"FINANCIALS: {data['financial'][:800]}\n\n"
-            comparison_text += f"RISKS: {data['risk'][:800]}\n\n"
+            comparison_text += f"DEBT: {data['debt'][:500]}\n\n"
+            comparison_text += f"FINANCIALS: {data['financial'][:500]}\n\n"
+            comparison_text += f"RISKS: {data['risk'][:500]}\n\n"
         
         prompt_content = f"""Compare these companies based on SEC 10-K filings:
 
@@ -89,13 +94,18 @@ Provide structured comparison:
 
 Keep under 500 words."""
 
-        # Use LangChain chain
-        analysis = self.comparison_chain.invoke({"prompt": prompt_content})
-        
+        # Stream tokens as they arrive for lower perceived latency
         print(f"{'='*70}")
         print("PEER COMPARISON REPORT")
         print(f"{'='*70}\n")
-        print(analysis)
+
+        pieces = []
+        for token in self.comparison_chain.stream({"prompt": prompt_content}):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+            pieces.append(token)
+        analysis = "".join(pieces)
+
         print(f"\n{'='*70}")
         
         return {
@@ -1,6 +1,8 @@
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+import asyncio
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -11,18 +13,57 @@ load_dotenv()
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from src.agent import _cache  # noqa: F401 - enables shared LLM cache
 from src.data.rag_system import CreditRAGSystem
 from src.tools.financial_calculator import calculate_debt_to_equity, assess_credit_rating
 from src.tools.market_data import get_company_fundamentals, get_stock_price
 from src.tools.news_search import NewsSearchTool
 
+# Tokens that mark a sentence as worth sending to the LLM
+_SIGNAL_TOKENS = {
+    "debt", "risk", "risks", "liquidity", "revenue", "earnings", "cash",
+    "credit", "leverage", "interest", "obligations", "margin", "loss",
+    "capital", "borrowings", "covenant", "rating", "default"
+}
+
+def _dedupe_chunks(docs: list) -> list:
+    """Drop retrieved chunks whose opening text has already appeared
+
+    Overlapping chunks routinely repeat each other; sending duplicates
+    just burns prompt tokens.
+    """
+    seen = set()
+    unique = []
+    for doc in docs:
+        key = re.sub(r"\s+", " ", doc)[:200]
+        if key not in seen:
+            seen.add(key)
+            unique.append(doc)
+    return unique
+
+def _top_sentences(text: str, max_chars: int = 800) -> str:
+    """Keep only high-signal sentences, up to a character budget"""
+    kept = []
+    total = 0
+    for sentence in re.split(r"(?<=\.)\s+", text):
+        # findall strips punctuation; a plain split leaves "debt." or
+        # "debt," stuck together and missing the token set
+        if not set(re.findall(r"[a-z]+", sentence.lower())) & _SIGNAL_TOKENS:
+            continue
+        if total + len(sentence) > max_chars:
+            break
+        kept.append(sentence)
+        total += len(sentence)
+
+    return " ".join(kept) if kept else text[:max_chars]
+
 class RAGCreditAgent:
     """Credit Analyst Agent using RAG + Groq + LangChain"""
     
     def __init__(self, model="llama-3.3-70b-versatile"):  # Updated model
         """Initialize agent with RAG system and LLM"""
         self.llm = ChatGroq(
-            temperature=0.1,
+            temperature=0,  # deterministic so cache hits match
             model_name=model,
             groq_api_key=os.getenv("GROQ_API_KEY")
         )
@@ -41,20 +82,41 @@ class RAGCreditAgent:
         # Create chain
         self.analysis_chain = self.analysis_prompt | self.llm | StrOutputParser()
     
-    def analyze_company(self, ticker: str, use_tools=True, use_news=True) -> dict:
-        """Perform comprehensive credit analysis with structured output"""
-        
+    async def analyze_company(self, ticker: str, use_tools=True, use_news=True,
+                              stream=True) -> dict:
+        """Perform comprehensive credit analysis with structured output
+
+        Set stream=False when several analyses run concurrently - token
+        echo from parallel tickers interleaves into unreadable output.
+        """
+
         print(f"\n{'='*70}")
         print(f"CREDIT ANALYSIS REPORT: {ticker}")
         print(f"{'='*70}\n")
-        
-        # Step 1: Get real-time market data
+
+        # Step 1: Gather all context concurrently. Market data, news, and
+        # the three RAG retrievals are independent blocking I/O, so running
+        # them together costs the slowest call instead of the sum.
+        print("Step 1/2: Gathering market data, news, and 10-K context...")
+
+        tasks = {
+            "risk": asyncio.to_thread(self.rag.get_risk_factors, ticker, n_results=3),
+            "financial": asyncio.to_thread(self.rag.get_financial_performance, ticker, n_results=3),
+            "debt": asyncio.to_thread(self.rag.get_debt_discussion, ticker, n_results=3),
+        }
+        if use_tools:
+            tasks["stock"] = asyncio.to_thread(get_stock_price, ticker)
+            tasks["fundamentals"] = asyncio.to_thread(get_company_fundamentals, ticker)
+        if use_news:
+            tasks["news"] = asyncio.to_thread(self.news_tool.get_news_summary, ticker)
+
+        results = dict(zip(tasks.keys(), await asyncio.gather(*tasks.values())))
+
         market_data = {}
         if use_tools:
-            print("Step 1/6: Fetching real-time market data...")
-            stock_data = get_stock_price(ticker)
-            fundamentals = get_company_fundamentals(ticker)
-            
+            stock_data = results["stock"]
+            fundamentals = results["fundamentals"]
+
             market_data = {
                 "stock_price": stock_data.get('current_price', 'N/A'),
                 "market_cap": fundamentals.get('market_cap', 0),
@@ -64,32 +126,18 @@ class RAGCreditAgent:
                 "return_on_equity": fundamentals.get('return_on_equity', 0),
                 "free_cash_flow": fundamentals.get('free_cash_flow', 0)
             }
-            
+
             print(f"  Current Price: ${market_data['stock_price']}")
             print(f"  Debt-to-Equity: {market_data['debt_to_equity']}")
-        
-        # Step 2: Get recent news
-        news_summary = ""
-        if use_news:
-            print("Step 2/6: Searching recent news...")
-            news_summary = self.news_tool.get_news_summary(ticker)
-            print("  Found recent articles")
-        
-        # Step 3-5: Retrieve from RAG
-        print("Step 3/6: Analyzing risk factors...")
-        risk_results = self.rag.get_risk_factors(ticker, n_results=3)
-        risk_context = "\n\n".join(risk_results["documents"])
-        
-        print("Step 4/6: Analyzing financial performance...")
-        financial_results = self.rag.get_financial_performance(ticker, n_results=3)
-        financial_context = "\n\n".join(financial_results["documents"])
-        
-        print("Step 5/6: Analyzing debt and liquidity...")
-        debt_results = self.rag.get_debt_discussion(ticker, n_results=3)
-        debt_context = "\n\n".join(debt_results["documents"])
-        
-        # Step 6: Generate analysis with LangChain
-        print("Step 6/6: Generating credit report with Groq AI...\n")
+
+        news_summary = results["news"] if use_news else ""
+
+        risk_context = "\n\n".join(_dedupe_chunks(results["risk"]["documents"]))
+        financial_context = "\n\n".join(_dedupe_chunks(results["financial"]["documents"]))
+        debt_context = "\n\n".join(_dedupe_chunks(results["debt"]["documents"]))
+
+        # Step 2: Generate analysis with LangChain
+        print("Step 2/2: Generating credit report with Groq AI...\n")
         
         prompt_content = f"""Analyze the creditworthiness of {ticker}.
 
@@ -100,16 +148,16 @@ MARKET DATA:
 - Debt-to-Equity: {market_data.get('debt_to_equity', 'N/A')}
 
 RECENT NEWS:
-{news_summary[:1000]}
+{news_summary[:500]}
 
 RISK FACTORS (from 10-K):
-{risk_context[:1500]}
+{_top_sentences(risk_context, max_chars=800)}
 
 FINANCIAL PERFORMANCE (from 10-K):
-{financial_context[:1500]}
+{_top_sentences(financial_context, max_chars=800)}
 
 DEBT & LIQUIDITY (from 10-K):
-{debt_context[:1500]}
+{_top_sentences(debt_context, max_chars=800)}
 
 Provide structured analysis:
 
@@ -121,18 +169,26 @@ Provide structured analysis:
 
 Keep under 400 words."""
 
-        # Use LangChain chain
-        analysis_text = self.analysis_chain.invoke({"prompt": prompt_content})
-        
-        # Extract rating from analysis
-        rating = self._extract_rating(analysis_text)
-        
-        # Display results
+        # Stream tokens as they arrive so output starts at Groq's first
+        # token instead of after the full completion
         print(f"{'='*70}")
         print(f"GROQ AI CREDIT ANALYSIS: {ticker}")
         print(f"{'='*70}\n")
-        print(analysis_text)
+
+        if stream:
+            pieces = []
+            async for token in self.analysis_chain.astream({"prompt": prompt_content}):
+                sys.stdout.write(token)
+                sys.stdout.flush()
+                pieces.append(token)
+            analysis_text = "".join(pieces)
+        else:
+            analysis_text = await self.analysis_chain.ainvoke({"prompt": prompt_content})
+
         print(f"\n{'='*70}")
+
+        # Extract rating from analysis
+        rating = self._extract_rating(analysis_text)
         
         # Structured output
         structured_output = {
@@ -156,13 +212,15 @@ Keep under 400 words."""
         
         return structured_output
     
+    # Word-boundary anchored so "A" can't match inside "AAPL" or "AI";
+    # prefer a rating that directly follows the word "rating"
+    _RATED_RE = re.compile(r"[Rr]ating[^A-Z]{0,20}\b(AAA|AA|A|BBB|BB|B|CCC)\b")
+    _RATING_RE = re.compile(r"\b(AAA|AA|A|BBB|BB|B|CCC)\b")
+
     def _extract_rating(self, text: str) -> str:
         """Extract credit rating from analysis text"""
-        ratings = ["AAA", "AA", "A", "BBB", "BB", "B", "CCC"]
-        for rating in ratings:
-            if rating in text:
-                return rating
-        return "Not Rated"
+        match = self._RATED_RE.search(text) or self._RATING_RE.search(text)
+        return match.group(1) if match else "Not Rated"
 
 
 def main():
@@ -174,7 +232,7 @@ def main():
         ticker = input("Enter company ticker (AAPL, MSFT, TSLA, GOOGL, AMZN, JPM, JNJ): ").upper()
     
     agent = RAGCreditAgent()
-    result = agent.analyze_company(ticker, use_tools=True, use_news=True)
+    result = asyncio.run(agent.analyze_company(ticker, use_tools=True, use_news=True))
     
     # Save structured output
     save = input("\nSave report to file? (y/n): ").lower()
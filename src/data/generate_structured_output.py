@@ -1,5 +1,8 @@
+import asyncio
 import json
 import csv
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -37,15 +40,16 @@ def analyze_and_structure(ticker: str) -> dict:
     return structured
 '''
 
-def analyze_and_structure(ticker: str) -> dict:
+def analyze_and_structure(ticker: str, agent: RAGCreditAgent) -> dict:
     """Run analysis and structure for lakehouse"""
-    
+
     print(f"\nAnalyzing {ticker}...")
-    
-    # Run credit analysis (now uses Groq + LangChain)
-    agent = RAGCreditAgent()
-    result = agent.analyze_company(ticker, use_tools=True, use_news=True)
-    
+
+    # Run credit analysis (now uses Groq + LangChain); no token
+    # streaming here - parallel tickers would interleave the echo
+    result = asyncio.run(agent.analyze_company(ticker, use_tools=True, use_news=True,
+                                               stream=False))
+
     # Helper function to convert to number or 0
     def to_number(value, default=None):  # Changed default to None
         if value == 'N/A' or value is None or value == '':
@@ -76,26 +80,41 @@ def process_companies(tickers: list, write_to_lakehouse=True, write_to_csv=True)
     """Process companies with Groq + LangChain pipeline"""
     
     lakehouse = CreditLakehouse() if write_to_lakehouse else None
-    
+
+    # Build the agent once: each construction reloads ChromaDB, the
+    # embedding model, and the news tool, so reuse it across tickers
+    agent = RAGCreditAgent()
+
     if write_to_csv:
         Path("data/processed").mkdir(parents=True, exist_ok=True)
-    
+
     all_data = []
-    
-    for ticker in tickers:
-        try:
-            data = analyze_and_structure(ticker)
-            all_data.append(data)
-            
-            # Write to lakehouse
-            if lakehouse:
-                lakehouse.write_analysis(data)
-                print(f"✓ Written {ticker} to lakehouse")
-            
-            print(f"✓ Completed {ticker}")
-            
-        except Exception as e:
-            print(f"✗ Failed {ticker}: {str(e)}")
+
+    # Each ticker is dominated by network I/O (Groq, yfinance, news,
+    # ChromaDB), so a small thread pool overlaps them
+    max_workers = int(os.getenv("MAX_WORKERS", 5))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(analyze_and_structure, ticker, agent): ticker
+            for ticker in tickers
+        }
+
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                data = future.result()
+                all_data.append(data)
+                print(f"✓ Completed {ticker}")
+
+            except Exception as e:
+                print(f"✗ Failed {ticker}: {str(e)}")
+
+    # One batched Delta write: one Parquet file + one commit instead of
+    # a tiny file per ticker
+    if lakehouse and all_data:
+        lakehouse.write_analyses(all_data)
+        lakehouse.compact()
     
     # Write CSV backup
     if write_to_csv and all_data:
@@ -10,17 +10,31 @@ class CreditLakehouse:
         """Initialize lakehouse"""
         self.lakehouse_path = lakehouse_path
         Path(lakehouse_path).mkdir(parents=True, exist_ok=True)
+
+        # Cache for read_all_cached, keyed by Delta table version
+        self._cached_version = None
+        self._cached_df = None
     
     def write_analysis(self, data: dict, mode="append"):
-        """Write credit analysis to lakehouse (replaces Fabric API)"""
-        
+        """Write a single credit analysis to lakehouse (replaces Fabric API)"""
+        self.write_analyses([data], mode=mode)
+
+    def write_analyses(self, records: list, mode="append"):
+        """Write a batch of credit analyses in one Delta transaction
+
+        One call per pipeline run produces one Parquet file and one Delta
+        commit instead of a tiny file per ticker, keeping read_all() fast.
+        """
+        if not records:
+            return
+
         # Convert to DataFrame
-        df = pd.DataFrame([data])
-        
+        df = pd.DataFrame(records)
+
         # Add metadata
         df['ingestion_timestamp'] = datetime.now()
         df['lakehouse_version'] = 1
-        
+
         # Write to Delta Lake
         write_deltalake(
             self.lakehouse_path,
@@ -28,13 +42,37 @@ class CreditLakehouse:
             mode=mode,
             schema_mode="merge"  # Auto-merge schema changes
         )
-        
-        print(f"✓ Written to lakehouse: {self.lakehouse_path}")
+
+        print(f"✓ Written {len(records)} record(s) to lakehouse: {self.lakehouse_path}")
+
+    def compact(self):
+        """Merge small Parquet files left behind by incremental appends"""
+        dt = DeltaTable(self.lakehouse_path)
+        dt.optimize.compact()
     
-    def read_all(self) -> pd.DataFrame:
-        """Read all data from lakehouse"""
+    def read_all(self, columns: list = None) -> pd.DataFrame:
+        """Read all data from lakehouse
+
+        Pass columns to read only those from the Parquet files; columnar
+        projection skips decoding everything else.
+        """
         dt = DeltaTable(self.lakehouse_path)
-        return dt.to_pandas()
+        return dt.to_pandas(columns=columns)
+
+    def read_all_cached(self) -> pd.DataFrame:
+        """Read all data, reusing the last result if the table is unchanged
+
+        The Delta table version is the cache key, so repeated reads of a
+        static lakehouse skip the Parquet decode entirely.
+        """
+        dt = DeltaTable(self.lakehouse_path)
+        version = dt.version()
+
+        if version != self._cached_version:
+            self._cached_df = dt.to_pandas()
+            self._cached_version = version
+
+        return self._cached_df
     
     def query(self, sql: str) -> pd.DataFrame:
         """Query lakehouse with SQL using DuckDB"""
@@ -47,15 +85,32 @@ class CreditLakehouse:
         result = duckdb.query(sql).df()
         return result
     
+    def _query_delta(self, sql: str, params=None) -> pd.DataFrame:
+        """Run SQL directly over the Delta table with predicate pushdown
+
+        DuckDB's delta_scan reads only the row groups and columns a query
+        needs, so lookups scale with matching rows, not table size.
+        """
+        import duckdb
+
+        con = duckdb.connect()
+        con.execute("INSTALL delta; LOAD delta;")
+        return con.execute(sql, params or []).df()
+
     def get_company_analysis(self, ticker: str) -> pd.DataFrame:
         """Get analysis for specific company"""
-        df = self.read_all()
-        return df[df['ticker'] == ticker]
-    
+        return self._query_delta(
+            f"SELECT * FROM delta_scan('{self.lakehouse_path}') WHERE ticker = ?",
+            [ticker]
+        )
+
     def get_latest_analyses(self, n: int = 10) -> pd.DataFrame:
         """Get N most recent analyses"""
-        df = self.read_all()
-        return df.sort_values('analysis_date', ascending=False).head(n)
+        return self._query_delta(
+            f"SELECT * FROM delta_scan('{self.lakehouse_path}') "
+            "ORDER BY analysis_date DESC LIMIT ?",
+            [n]
+        )
 
 
 if __name__ == "__main__":
@@ -1,11 +1,25 @@
 import chromadb
 from chromadb.utils import embedding_functions
+from sentence_transformers import SentenceTransformer
+import faiss
+import json
+import numpy as np
 import os
+import re
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _pick_device():
+    """Pick the fastest available device for embedding"""
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
 class CreditRAGSystem:
     """RAG system for SEC 10-K filings"""
     
@@ -25,49 +39,179 @@ class CreditRAGSystem:
             model_name="all-MiniLM-L6-v2"  # Fast, good quality, free
         )
         
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="credit_documents",
-            embedding_function=self.embedding_function
-        )
-    
+        # Dedicated model handle for bulk document embedding - encode()
+        # with a large batch uses the hardware far better than the small
+        # internal batches of the Chroma embedding function
+        self.st_model = SentenceTransformer("all-MiniLM-L6-v2", device=_pick_device())
+
+        # One collection per ticker, opened lazily. Partitioning keeps
+        # each HNSW graph to a single company's chunks, so a filtered
+        # retrieval searches a small per-company index instead of
+        # post-filtering the global one
+        self._collections = {}
+
+        # FAISS sidecar indexes for the retrieval hot path: native HNSW
+        # answers the nearest-neighbour search, ChromaDB stays the
+        # document store the hits are fetched from
+        self._faiss = {}
+        self._faiss_dir = Path(persist_directory) / "faiss"
+        self._faiss_dir.mkdir(parents=True, exist_ok=True)
+
+        # The three section queries are constants - embed them once so
+        # every retrieval skips the transformer forward pass
+        static_queries = {
+            "risk": "risk factors business risks financial risks market risks operational risks",
+            "financial": "revenue earnings profit loss performance results operations financial condition",
+            "debt": "debt obligations borrowings liquidity capital structure financing"
+        }
+        self._static_query_embeddings = {
+            name: self.st_model.encode([query], normalize_embeddings=True)[0].tolist()
+            for name, query in static_queries.items()
+        }
+
+    def _get_collection(self, ticker: str):
+        """Lazily open the per-ticker collection"""
+        if ticker not in self._collections:
+            self._collections[ticker] = self.client.get_or_create_collection(
+                name=f"credit_documents_{ticker}",
+                embedding_function=self.embedding_function
+            )
+        return self._collections[ticker]
+
+    def _known_tickers(self):
+        """Tickers that already have a collection in the persisted store"""
+        prefix = "credit_documents_"
+        return [c.name[len(prefix):] for c in self.client.list_collections()
+                if c.name.startswith(prefix)]
+
+    def _faiss_paths(self, ticker: str):
+        return (self._faiss_dir / f"{ticker}.index",
+                self._faiss_dir / f"{ticker}_ids.json")
+
+    def _get_faiss(self, ticker: str):
+        """Load (or lazily create) the FAISS sidecar index for a ticker"""
+        if ticker not in self._faiss:
+            index_path, ids_path = self._faiss_paths(ticker)
+
+            if index_path.exists():
+                index = faiss.read_index(str(index_path))
+                ids = json.loads(ids_path.read_text())
+            else:
+                index = faiss.IndexHNSWFlat(384, 32)
+                ids = []
+
+            self._faiss[ticker] = (index, ids)
+
+        return self._faiss[ticker]
+
+    def _faiss_search(self, ticker: str, query_embeddings, n_results: int):
+        """Search a ticker's FAISS index, fetching documents from ChromaDB
+
+        Returns a list (one entry per query) of (document, metadata,
+        distance) hit lists, or None if no sidecar index exists yet.
+        """
+        index, faiss_ids = self._get_faiss(ticker)
+        if not index.ntotal:
+            return None
+
+        k = min(n_results, index.ntotal)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        distances, rows = index.search(queries, k)
+
+        # Gather the hit documents from ChromaDB in one get
+        hit_ids = [faiss_ids[r] for row in rows for r in row if r != -1]
+        got = self._get_collection(ticker).get(ids=hit_ids)
+        by_id = dict(zip(got["ids"], zip(got["documents"], got["metadatas"])))
+
+        per_query = []
+        for dist_row, row in zip(distances, rows):
+            hits = []
+            for dist, r in zip(dist_row, row):
+                if r == -1:
+                    continue
+                doc, meta = by_id[faiss_ids[r]]
+                hits.append((doc, meta, float(dist)))
+            per_query.append(hits)
+
+        return per_query
+
     def chunk_document(self, text: str, chunk_size: int = 1000, overlap: int = 200):
         """Split document into overlapping chunks"""
+        # Find every sentence end once in a single C-level pass, then pick
+        # chunk boundaries with searchsorted instead of rfind per chunk
+        if text.isascii():
+            data = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+            periods = np.flatnonzero(data == ord('.'))
+        else:
+            periods = np.array([m.start() for m in re.finditer(r'\.', text)])
+
         chunks = []
         start = 0
-        
-        while start < len(text):
+        n = len(text)
+
+        while start < n:
             end = start + chunk_size
-            chunk = text[start:end]
-            
+
             # Try to break at sentence boundary
-            if end < len(text):
-                last_period = chunk.rfind('.')
-                if last_period > chunk_size * 0.5:
-                    end = start + last_period + 1
-                    chunk = text[start:end]
-            
-            chunks.append(chunk.strip())
+            if end < n and len(periods):
+                idx = np.searchsorted(periods, end)
+                if idx > 0:
+                    last_period = int(periods[idx - 1])
+                    if last_period - start > chunk_size * 0.5:
+                        end = last_period + 1
+
+            chunks.append(text[start:end].strip())
             start = end - overlap
-        
+
         return chunks
     
-    def add_document(self, ticker: str, document_text: str, doc_type: str = "10-K"):
+    def add_document(self, ticker: str, document_text: str, doc_type: str = "10-K",
+                     force: bool = False):
         """Add a 10-K document to the vector store"""
-        
+
         print(f"\nAdding {ticker} {doc_type} to RAG system...")
-        
+
+        # Skip already-indexed tickers so repeat builds cost nothing
+        if self._get_collection(ticker).count():
+            if not force:
+                print(f"  {ticker} already indexed, skipping (force=True to reindex)")
+                return
+
+            # Reindex from scratch: drop the stale collection and FAISS
+            # sidecar, otherwise ChromaDB rejects the duplicate ids and
+            # the sidecar accumulates a second copy of every vector
+            print(f"  Reindexing {ticker}: dropping existing index")
+            self.client.delete_collection(f"credit_documents_{ticker}")
+            self._collections.pop(ticker, None)
+            self._faiss.pop(ticker, None)
+            for path in self._faiss_paths(ticker):
+                path.unlink(missing_ok=True)
+
         # Chunk the document
         chunks = self.chunk_document(document_text)
         print(f"  Created {len(chunks)} chunks")
-        
+
+        # Embed everything in one large-batch pass
+        embeddings = self.st_model.encode(
+            chunks,
+            batch_size=256,
+            show_progress_bar=False,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+
+        # Keep embeddings in fp16: halves the working set with no
+        # measurable recall loss for normalized MiniLM vectors
+        embeddings = embeddings.astype(np.float16)
+
+        all_ids = [f"{ticker}_{doc_type}_{j}" for j in range(len(chunks))]
+
         # Add in batches to avoid ChromaDB limit
         batch_size = 5000
         for i in range(0, len(chunks), batch_size):
             batch_chunks = chunks[i:i + batch_size]
-            
-            # Create unique IDs and metadata for this batch
-            ids = [f"{ticker}_{doc_type}_{j}" for j in range(i, i + len(batch_chunks))]
+
+            # Create metadata for this batch
             metadatas = [
                 {
                     "ticker": ticker,
@@ -77,48 +221,128 @@ class CreditRAGSystem:
                 }
                 for j in range(i, i + len(batch_chunks))
             ]
-            
-            # Add batch to ChromaDB
-            self.collection.add(
+
+            # Add batch to this ticker's ChromaDB collection
+            self._get_collection(ticker).add(
                 documents=batch_chunks,
+                embeddings=embeddings[i:i + batch_size].astype(np.float32).tolist(),
                 metadatas=metadatas,
-                ids=ids
+                ids=all_ids[i:i + batch_size]
             )
             print(f"  Added batch {i//batch_size + 1} ({len(batch_chunks)} chunks)")
-        
+
+        # Mirror the vectors into the persisted FAISS sidecar
+        index, faiss_ids = self._get_faiss(ticker)
+        index.add(embeddings.astype(np.float32))
+        faiss_ids.extend(all_ids)
+
+        index_path, ids_path = self._faiss_paths(ticker)
+        faiss.write_index(index, str(index_path))
+        ids_path.write_text(json.dumps(faiss_ids))
+
         print(f"  ✓ Added {ticker} to vector database")
     
-    def retrieve(self, query: str, ticker: str = None, n_results: int = 5):
-        """Retrieve relevant chunks for a query"""
-        
-        where_filter = {"ticker": ticker} if ticker else None
-        
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_filter
-        )
-        
+    def retrieve(self, query: str = None, ticker: str = None, n_results: int = 5,
+                 query_embedding=None):
+        """Retrieve relevant chunks for a query (or precomputed embedding)"""
+
+        if query_embedding is None:
+            query_embedding = self.st_model.encode(
+                [query], normalize_embeddings=True
+            )[0].tolist()
+
+        # With a ticker, search only that company's partition; otherwise
+        # search every partition and keep the globally closest hits
+        tickers = [ticker] if ticker else self._known_tickers()
+
+        hits = []
+        for t in tickers:
+            faiss_hits = self._faiss_search(t, [query_embedding], n_results)
+            if faiss_hits is not None:
+                hits.extend(faiss_hits[0])
+                continue
+
+            # Fall back to ChromaDB until a sidecar index exists
+            results = self._get_collection(t).query(
+                query_embeddings=[query_embedding],
+                n_results=n_results
+            )
+            hits.extend(zip(results["documents"][0],
+                            results["metadatas"][0],
+                            results["distances"][0]))
+
+        hits.sort(key=lambda hit: hit[2])
+        hits = hits[:n_results]
+
         return {
-            "documents": results["documents"][0],
-            "metadatas": results["metadatas"][0],
-            "distances": results["distances"][0]
+            "documents": [hit[0] for hit in hits],
+            "metadatas": [hit[1] for hit in hits],
+            "distances": [hit[2] for hit in hits]
         }
     
+    def batch_retrieve(self, queries: dict, tickers: list, n_results: int = 2):
+        """Run several named queries over several tickers
+
+        Each ticker's partition answers all query texts in one batched
+        call, so this costs len(tickers) calls instead of
+        len(queries) * len(tickers). Returns {ticker: {query_name: [documents]}}.
+        """
+        names = list(queries.keys())
+        query_embeddings = self.st_model.encode(
+            [queries[name] for name in names], normalize_embeddings=True
+        ).tolist()
+
+        buckets = {}
+        for ticker in tickers:
+            faiss_hits = self._faiss_search(ticker, query_embeddings, n_results)
+            if faiss_hits is not None:
+                buckets[ticker] = {
+                    name: [doc for doc, meta, dist in hits]
+                    for name, hits in zip(names, faiss_hits)
+                }
+                continue
+
+            # Fall back to ChromaDB until a sidecar index exists
+            results = self._get_collection(ticker).query(
+                query_embeddings=query_embeddings,
+                n_results=n_results
+            )
+            buckets[ticker] = dict(zip(names, results["documents"]))
+
+        return buckets
+
     def get_risk_factors(self, ticker: str, n_results: int = 3):
         """Retrieve risk factor sections"""
-        query = "risk factors business risks financial risks market risks operational risks"
-        return self.retrieve(query, ticker, n_results)
-    
+        return self.retrieve(ticker=ticker, n_results=n_results,
+                             query_embedding=self._static_query_embeddings["risk"])
+
     def get_financial_performance(self, ticker: str, n_results: int = 3):
         """Retrieve financial performance discussions"""
-        query = "revenue earnings profit loss performance results operations financial condition"
-        return self.retrieve(query, ticker, n_results)
-    
+        return self.retrieve(ticker=ticker, n_results=n_results,
+                             query_embedding=self._static_query_embeddings["financial"])
+
     def get_debt_discussion(self, ticker: str, n_results: int = 3):
         """Retrieve debt and capital structure sections"""
-        query = "debt obligations borrowings liquidity capital structure financing"
-        return self.retrieve(query, ticker, n_results)
+        return self.retrieve(ticker=ticker, n_results=n_results,
+                             query_embedding=self._static_query_embeddings["debt"])
+
+def _clean_10k(text: str) -> str:
+    """Strip SGML/HTML boilerplate from a raw EDGAR full submission
+
+    Raw full-submission.txt files are mostly markup and base64-encoded
+    exhibits; dropping those before chunking leaves the narrative text
+    and cuts the number of chunks to embed by roughly an order of
+    magnitude.
+    """
+    # Cut binary exhibits (base64 graphic/archive blocks dominate size)
+    text = re.split(r"<TYPE>(?:GRAPHIC|ZIP|EXCEL|PDF|JSON)", text)[0]
+
+    # Drop markup tags and entities, then collapse whitespace
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"&[a-zA-Z#0-9]+;", " ", text)
+    text = re.sub(r"\s+", " ", text)
+
+    return text.strip()
 
 def build_rag_database(tickers: list):
     """Build RAG database for multiple companies"""
@@ -127,31 +351,24 @@ def build_rag_database(tickers: list):
     
     for ticker in tickers:
         # Find the 10-K file using your structure: data/raw/sec-edgar-filings/TICKER/10-K/
-        filepath = None
         search_path = f"data/raw/sec-edgar-filings/{ticker}/10-K"
-        
+
         # Also check root level sec-edgar-filings
         if not os.path.exists(search_path):
             search_path = f"sec-edgar-filings/{ticker}/10-K"
-        
-        for root, dirs, files in os.walk(search_path):
-            for file in files:
-                if file == 'full-submission.txt':
-                    filepath = os.path.join(root, file)
-                    break
-            if filepath:
-                break
-        
-        if not filepath:
+
+        # rglob short-circuits at the first match
+        filepath = next(Path(search_path).rglob("full-submission.txt"), None)
+
+        if filepath is None:
             print(f"No 10-K found for {ticker} in {search_path}")
             continue
-        
+
         # Read document
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            text = f.read()
+        text = filepath.read_text(encoding='utf-8', errors='ignore')
         
-        # Add to RAG system
-        rag.add_document(ticker, text)
+        # Strip markup and exhibits, then add to RAG system
+        rag.add_document(ticker, _clean_10k(text))
     
     print("\n✓ RAG database built successfully")
     return rag
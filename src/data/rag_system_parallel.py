@@ -1,24 +1,39 @@
+import bisect
 import chromadb
-from chromadb.utils import embedding_functions
+import hashlib
+import mmap
+from fastembed import TextEmbedding
 import os
+import re
 from pathlib import Path
 from dotenv import load_dotenv
-from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
 load_dotenv()
 
 
 # ---------------------------------------------------------------------
-# Parallel embedding worker
+# ONNX int8 embedding function
 # ---------------------------------------------------------------------
-def embed_worker(chunks_subset):
-    """Worker process: embeds a subset of chunks"""
-    from chromadb.utils import embedding_functions
-    embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
-    return embedding_fn(chunks_subset)
+class FastembedEmbeddingFunction:
+    """ChromaDB embedding function backed by fastembed's ONNX MiniLM
+
+    The quantized ONNX model runs int8 matmul kernels on CPU - several
+    times the throughput of the FP32 PyTorch path at comparable
+    retrieval quality.
+    """
+
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2"):
+        self._embedder = TextEmbedding(model_name)
+
+    def __call__(self, input):
+        return self.embed(input).tolist()
+
+    def embed(self, texts, batch_size=256):
+        return np.array(
+            list(self._embedder.embed(texts, batch_size=batch_size)),
+            dtype=np.float32
+        )
 
 
 # ---------------------------------------------------------------------
@@ -34,84 +49,163 @@ class CreditRAGSystem:
 
         self.client = chromadb.PersistentClient(path=persist_directory)
 
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
+        # One model, loaded once; the quantized ONNX backend replaces the
+        # FP32 PyTorch sentence-transformers path
+        self.embedding_function = FastembedEmbeddingFunction()
 
+        # Cosine is the natural metric for MiniLM embeddings; the HNSW
+        # parameters trade a slower one-off build for better recall at a
+        # given search ef
         self.collection = self.client.get_or_create_collection(
             name="credit_documents",
-            embedding_function=self.embedding_function
+            embedding_function=self.embedding_function,
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:M": 32,
+                "hnsw:construction_ef": 200,
+                "hnsw:search_ef": 64
+            }
         )
 
+        # The three section queries never change - embed them once so
+        # repeat retrievals skip the embedding forward pass
+        static_queries = {
+            "risk": "risk factors business risks financial risks market risks operational risks",
+            "financial": "revenue earnings profit loss performance results operations financial condition",
+            "debt": "debt obligations borrowings liquidity capital structure financing"
+        }
+        self._static_query_embeddings = {
+            name: self.embedding_function([query])[0]
+            for name, query in static_queries.items()
+        }
+
     # -----------------------------------------------------------------
     def chunk_document(self, text: str, chunk_size: int = 1000, overlap: int = 200):
         """Split document into overlapping chunks"""
+        # Precompute every sentence end in one pass; each chunk boundary
+        # is then a binary search instead of an rfind over a fresh slice
+        ends = [m.end() for m in re.finditer(r'\.', text)]
+
         chunks = []
         start = 0
+        n = len(text)
 
-        while start < len(text):
+        while start < n:
             end = start + chunk_size
+
+            if end < n and ends:
+                idx = bisect.bisect_right(ends, end)
+                if idx > 0 and ends[idx - 1] - start > chunk_size * 0.5:
+                    end = ends[idx - 1]
+
             chunk = text[start:end]
-            if end < len(text):
-                last_period = chunk.rfind('.')
-                if last_period > chunk_size * 0.5:
-                    end = start + last_period + 1
-                    chunk = text[start:end]
-            chunks.append(chunk.strip())
+            # strip() allocates; only do it when there is whitespace
+            if chunk[:1].isspace() or chunk[-1:].isspace():
+                chunk = chunk.strip()
+            chunks.append(chunk)
             start = end - overlap
+
         return chunks
 
     # -----------------------------------------------------------------
-    def add_document(self, ticker: str, document_text: str, doc_type: str = "10-K", n_workers: int = 4):
-        """Add a 10-K document to the vector store (parallelized embedding)"""
-        print(f"\nAdding {ticker} {doc_type} to RAG system...")
-
-        chunks = self.chunk_document(document_text)
-        print(f"  Created {len(chunks)} chunks")
-
-        # Split chunks evenly across workers
-        chunk_splits = np.array_split(chunks, n_workers)
-        chunk_splits = [list(split) for split in chunk_splits if len(split) > 0]
-
-        print(f"  Using {n_workers} parallel workers for embedding...")
-
-        # Parallel embedding
-        with ProcessPoolExecutor(max_workers=n_workers) as executor:
-            embeddings = list(executor.map(embed_worker, chunk_splits))
-
-        # Combine all embeddings
-        embeddings = np.vstack(embeddings)
+    def add_document(self, ticker: str, document_text: str, doc_type: str = "10-K"):
+        """Add a single 10-K document to the vector store"""
+        self.add_documents({ticker: document_text}, doc_type=doc_type)
+
+    def add_documents(self, texts_by_ticker: dict, doc_type: str = "10-K"):
+        """Add several tickers' filings in one embed + insert pass
+
+        Chunks from all tickers form one large embedding batch and a few
+        big collection.add calls, amortizing the per-insert HNSW graph
+        maintenance that per-ticker adds pay repeatedly.
+        """
+        all_chunks = []
+        all_ids = []
+        all_metadatas = []
+
+        for ticker, document_text in texts_by_ticker.items():
+            chunks = self.chunk_document(document_text)
+            print(f"  {ticker}: {len(chunks)} chunks")
+
+            # Shared id prefix and metadata base: only chunk_id varies,
+            # so avoid re-formatting and re-hashing the constant fields
+            # for every chunk
+            prefix = f"{ticker}_{doc_type}_"
+            base = {"ticker": ticker, "doc_type": doc_type, "total_chunks": len(chunks)}
+
+            # Content-hashed ids make reruns idempotent: an unchanged
+            # chunk always maps to the same id, and duplicates within a
+            # filing collapse to one entry
+            seen = set()
+            for j, chunk in enumerate(chunks):
+                digest = hashlib.blake2b(chunk.encode(), digest_size=8).hexdigest()
+                chunk_id = prefix + digest
+                if chunk_id in seen:
+                    continue
+                seen.add(chunk_id)
+
+                all_chunks.append(chunk)
+                all_ids.append(chunk_id)
+                all_metadatas.append({**base, "chunk_id": j})
+
+        # Skip chunks whose content hash is already in the collection so
+        # reruns only embed the delta
+        existing = set()
+        for i in range(0, len(all_ids), 4096):
+            existing.update(self.collection.get(ids=all_ids[i:i + 4096])["ids"])
+
+        if existing:
+            keep = [i for i, chunk_id in enumerate(all_ids) if chunk_id not in existing]
+            all_chunks = [all_chunks[i] for i in keep]
+            all_ids = [all_ids[i] for i in keep]
+            all_metadatas = [all_metadatas[i] for i in keep]
+            print(f"  Skipping {len(existing)} already-indexed chunks")
+
+        if not all_chunks:
+            print("  ✓ Nothing new to index")
+            return
+
+        # Smart batching: sort by length so each mini-batch pads only to
+        # its own longest chunk (padding tokens are wasted FLOPs), then
+        # restore the original order afterwards
+        sort_idx = np.argsort([len(chunk) for chunk in all_chunks])
+        sorted_chunks = [all_chunks[i] for i in sort_idx]
+
+        embeddings = self.embedding_function.embed(sorted_chunks, batch_size=256)
+        embeddings = embeddings[np.argsort(sort_idx)]
         print(f"  Embedding complete. Adding to ChromaDB...")
 
-        ids = [f"{ticker}_{doc_type}_{j}" for j in range(len(chunks))]
-        metadatas = [
-            {
-                "ticker": ticker,
-                "doc_type": doc_type,
-                "chunk_id": j,
-                "total_chunks": len(chunks)
-            }
-            for j in range(len(chunks))
-        ]
-
-        self.collection.add(
-            documents=chunks,
-            embeddings=embeddings.tolist(),
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Insert in large batches to stay under ChromaDB's record limit
+        batch_size = 4096
+        for i in range(0, len(all_chunks), batch_size):
+            self.collection.add(
+                documents=all_chunks[i:i + batch_size],
+                embeddings=embeddings[i:i + batch_size].tolist(),
+                metadatas=all_metadatas[i:i + batch_size],
+                ids=all_ids[i:i + batch_size]
+            )
 
-        print(f"  ✓ Added {ticker} ({len(chunks)} chunks, parallel embedded)")
+        print(f"  ✓ Added {len(texts_by_ticker)} ticker(s) ({len(all_chunks)} chunks)")
 
     # -----------------------------------------------------------------
-    def retrieve(self, query: str, ticker: str = None, n_results: int = 5):
-        """Retrieve relevant chunks for a query"""
+    def retrieve(self, query: str = None, ticker: str = None, n_results: int = 5,
+                 query_embedding=None):
+        """Retrieve relevant chunks for a query (or precomputed embedding)"""
         where_filter = {"ticker": ticker} if ticker else None
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_filter
-        )
+
+        if query_embedding is not None:
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where_filter
+            )
+        else:
+            results = self.collection.query(
+                query_texts=[query],
+                n_results=n_results,
+                where=where_filter
+            )
+
         return {
             "documents": results["documents"][0],
             "metadatas": results["metadatas"][0],
@@ -119,47 +213,50 @@ class CreditRAGSystem:
         }
 
     def get_risk_factors(self, ticker: str, n_results: int = 3):
-        query = "risk factors business risks financial risks market risks operational risks"
-        return self.retrieve(query, ticker, n_results)
+        return self.retrieve(ticker=ticker, n_results=n_results,
+                             query_embedding=self._static_query_embeddings["risk"])
 
     def get_financial_performance(self, ticker: str, n_results: int = 3):
-        query = "revenue earnings profit loss performance results operations financial condition"
-        return self.retrieve(query, ticker, n_results)
+        return self.retrieve(ticker=ticker, n_results=n_results,
+                             query_embedding=self._static_query_embeddings["financial"])
 
     def get_debt_discussion(self, ticker: str, n_results: int = 3):
-        query = "debt obligations borrowings liquidity capital structure financing"
-        return self.retrieve(query, ticker, n_results)
+        return self.retrieve(ticker=ticker, n_results=n_results,
+                             query_embedding=self._static_query_embeddings["debt"])
 
 
 # ---------------------------------------------------------------------
 # Build database from multiple tickers
 # ---------------------------------------------------------------------
-def build_rag_database(tickers: list, persist_directory="data/chroma_db_parallel", n_workers=4):
+def build_rag_database(tickers: list, persist_directory="data/chroma_db_parallel"):
     """Build RAG database for multiple companies"""
     rag = CreditRAGSystem(persist_directory)
 
+    # Gather every ticker's filing first so chunking, embedding, and
+    # insertion each run as one big batch
+    texts_by_ticker = {}
+
     for ticker in tickers:
-        filepath = None
         search_path = f"data/raw/sec-edgar-filings/{ticker}/10-K"
         if not os.path.exists(search_path):
             search_path = f"sec-edgar-filings/{ticker}/10-K"
 
-        for root, dirs, files in os.walk(search_path):
-            for file in files:
-                if file == 'full-submission.txt':
-                    filepath = os.path.join(root, file)
-                    break
-            if filepath:
-                break
+        # rglob short-circuits at the first match
+        filepath = next(Path(search_path).rglob("full-submission.txt"), None)
 
-        if not filepath:
+        if filepath is None:
             print(f"No 10-K found for {ticker} in {search_path}")
             continue
 
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            text = f.read()
+        # mmap lets the OS page the file in on demand; latin-1 decoding
+        # of the mostly-ASCII filings is a straight byte-to-codepoint
+        # copy with no error handling on the hot path
+        with open(filepath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                texts_by_ticker[ticker] = mm[:].decode('latin-1')
 
-        rag.add_document(ticker, text, n_workers=n_workers)
+    if texts_by_ticker:
+        rag.add_documents(texts_by_ticker)
 
     print("\n✓ RAG database built successfully")
     return rag
@@ -170,7 +267,7 @@ def build_rag_database(tickers: list, persist_directory="data/chroma_db_parallel
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
     tickers = ['AAPL', 'MSFT', 'TSLA', 'GOOGL', 'AMZN', 'JPM', 'JNJ']
-    rag = build_rag_database(tickers, n_workers=16)
+    rag = build_rag_database(tickers)
 
     print("\n" + "=" * 70)
     print("TESTING RAG RETRIEVAL")
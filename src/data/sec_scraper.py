@@ -1,5 +1,6 @@
 from sec_edgar_downloader import Downloader
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Download 10-K filings
 dl = Downloader("MyCompany", "email@example.com", download_folder="./../../data/raw")
@@ -7,9 +8,15 @@ dl = Downloader("MyCompany", "email@example.com", download_folder="./../../data/
 # Download for multiple companies
 tickers = ["AAPL", "MSFT", "TSLA", "GOOGL", "AMZN", "JPM", "JNJ"]
 
-for ticker in tickers:
+def download(ticker):
     print(f"Downloading {ticker}...")
+    time.sleep(0.11)  # stay under SEC's 10 requests/second cap
     dl.get("10-K", ticker, limit=1, download_details=True)
     print(f"✓ Downloaded {ticker} 10-K")
 
+# EDGAR downloads are network-bound, so a small pool overlaps them while
+# the per-task sleep keeps the request rate SEC-compliant
+with ThreadPoolExecutor(max_workers=4) as executor:
+    list(executor.map(download, tickers))
+
 print("\n✓ All downloads complete")
@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 def calculate_debt_to_equity(debt: float, equity: float) -> dict:
     """Calculate debt-to-equity ratio"""
     if equity == 0:
@@ -118,6 +121,59 @@ def assess_credit_rating(debt_to_equity: float, debt_to_assets: float,
     }
 
 
+# Rating ladder from assess_credit_rating as sorted threshold arrays
+_D2E_LADDER = np.array([0.3, 0.5, 1.0, 2.0])
+_D2A_LADDER = np.array([0.2, 0.3, 0.5])
+_RATINGS = np.array(["Aa", "A", "Baa", "Ba", "B"])
+_RISK_LEVELS = np.array(["Minimal", "Low", "Moderate", "Substantial", "High"])
+
+
+def compute_all_ratios(debt, equity, assets, ebitda, interest_expense,
+                       current_assets, current_liabilities) -> pd.DataFrame:
+    """Compute every calculator ratio for a batch of companies in one pass
+
+    Accepts scalars, lists, or pandas Series. Replaces five separate
+    per-company calls (and their dicts) with one vectorized sweep; zero
+    denominators yield NaN (infinite for interest coverage) instead of
+    error dicts.
+    """
+    debt = np.atleast_1d(np.asarray(debt, dtype=float))
+    equity = np.atleast_1d(np.asarray(equity, dtype=float))
+    assets = np.atleast_1d(np.asarray(assets, dtype=float))
+    ebitda = np.atleast_1d(np.asarray(ebitda, dtype=float))
+    interest_expense = np.atleast_1d(np.asarray(interest_expense, dtype=float))
+    current_assets = np.atleast_1d(np.asarray(current_assets, dtype=float))
+    current_liabilities = np.atleast_1d(np.asarray(current_liabilities, dtype=float))
+
+    def safe_divide(numerator, denominator, fill=np.nan):
+        return np.divide(numerator, denominator,
+                         out=np.full(numerator.shape, fill),
+                         where=denominator != 0)
+
+    debt_to_equity = safe_divide(debt, equity)
+    debt_to_assets = safe_divide(debt, assets)
+    interest_coverage = safe_divide(ebitda, interest_expense, fill=np.inf)
+    current_ratio = safe_divide(current_assets, current_liabilities)
+
+    # Same ladder as assess_credit_rating: the worse rung demanded by
+    # either leverage ratio wins, with Aaa reserved for strong coverage
+    level = np.maximum(
+        np.searchsorted(_D2E_LADDER, debt_to_equity, side='right'),
+        np.searchsorted(_D2A_LADDER, debt_to_assets, side='right')
+    )
+    ratings = np.where((level == 0) & (interest_coverage > 10), "Aaa", _RATINGS[level])
+
+    return pd.DataFrame({
+        "debt_to_equity": np.round(debt_to_equity, 2),
+        "debt_to_assets": np.round(debt_to_assets, 2),
+        "interest_coverage": np.round(interest_coverage, 2),
+        "current_ratio": np.round(current_ratio, 2),
+        "credit_rating": ratings,
+        "risk_level": _RISK_LEVELS[level],
+        "investment_grade": level <= 2
+    })
+
+
 if __name__ == "__main__":
     # Test the tools
     print("Testing Financial Calculator Tools\n")
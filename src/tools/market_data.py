@@ -1,12 +1,29 @@
 import yfinance as yf
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Each Ticker.info read is an HTTP round-trip, and the agents ask for
+# the same ticker several times back-to-back - cache it briefly
+_INFO_TTL_SECONDS = 300
+_info_cache = {}
+
+def _get_info(ticker: str) -> dict:
+    """Fetch Ticker.info with a short per-ticker TTL cache"""
+    cached = _info_cache.get(ticker)
+    if cached and time.time() - cached[0] < _INFO_TTL_SECONDS:
+        return cached[1]
+
+    info = yf.Ticker(ticker).info
+    _info_cache[ticker] = (time.time(), info)
+    return info
+
+
 def get_stock_price(ticker: str) -> dict:
     """Get current stock price and basic info"""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
+        info = _get_info(ticker)
+
         return {
             "ticker": ticker,
             "current_price": info.get('currentPrice', 'N/A'),
@@ -23,9 +40,8 @@ def get_stock_price(ticker: str) -> dict:
 def get_company_fundamentals(ticker: str) -> dict:
     """Get key financial fundamentals"""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
+        info = _get_info(ticker)
+
         return {
             "ticker": ticker,
             "revenue": info.get('totalRevenue', 'N/A'),
@@ -42,16 +58,16 @@ def get_company_fundamentals(ticker: str) -> dict:
 
 def compare_market_caps(tickers: list) -> dict:
     """Compare market capitalizations"""
-    results = {}
-    
-    for ticker in tickers:
+    def fetch(ticker):
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            results[ticker] = info.get('marketCap', 0)
+            return _get_info(ticker).get('marketCap', 0)
         except:
-            results[ticker] = 0
-    
+            return 0
+
+    # I/O-bound fetches overlap cleanly in a thread pool
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = dict(zip(tickers, executor.map(fetch, tickers)))
+
     # Sort by market cap
     sorted_results = dict(sorted(results.items(), key=lambda x: x[1], reverse=True))
     
@@ -1,24 +1,49 @@
 from tavily import TavilyClient
 import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from datetime import datetime
 
 load_dotenv()
 
+# News feeds don't change second to second - reuse results briefly
+_NEWS_TTL_SECONDS = 300
+
 class NewsSearchTool:
     """Search recent news using Tavily API"""
-    
+
     def __init__(self):
         api_key = os.getenv("TAVILY_API_KEY")
         if not api_key:
             raise ValueError("TAVILY_API_KEY not found in .env")
-        self.client = TavilyClient(api_key=api_key)
-    
+
+        # Pooled session so repeated searches reuse the TLS connection
+        # instead of paying a fresh handshake per call
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        )
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = "gzip"
+        self.client = TavilyClient(api_key=api_key, session=session)
+
+        self._news_cache = {}
+
     def search_company_news(self, ticker: str, max_results: int = 5) -> dict:
         """Search recent news about a company"""
-        
+
+        cache_key = (ticker, max_results)
+        cached = self._news_cache.get(cache_key)
+        if cached and time.time() - cached[0] < _NEWS_TTL_SECONDS:
+            return cached[1]
+
         query = f"{ticker} stock financial news credit risk debt earnings"
-        
+
         try:
             response = self.client.search(
                 query=query,
@@ -37,14 +62,18 @@ class NewsSearchTool:
                     "score": result.get('score', 0)
                 })
             
-            return {
+            news = {
                 "ticker": ticker,
                 "query": query,
                 "news_count": len(results),
                 "results": results,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
-            
+
+            # Only successful responses are cached
+            self._news_cache[cache_key] = (time.time(), news)
+            return news
+
         except Exception as e:
             return {
                 "error": f"News search failed: {str(e)}",
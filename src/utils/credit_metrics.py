@@ -1,57 +1,81 @@
+import numpy as np
+import pandas as pd
+
 def calculate_interest_coverage(ebitda: float, interest_expense: float) -> float:
     """Calculate interest coverage ratio"""
     if interest_expense == 0:
         return float('inf')
     return ebitda / interest_expense
 
-def calculate_altman_z_score(working_capital: float, retained_earnings: float, 
-                             ebit: float, market_cap: float, sales: float, 
+def altman_z_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """Calculate Altman Z-Scores for a whole portfolio in one pass
+
+    Expects columns: working_capital, retained_earnings, ebit,
+    market_cap, sales, total_assets, total_liabilities. One vectorized
+    sweep replaces a Python call per company.
+    """
+    x1 = df['working_capital'] / df['total_assets']
+    x2 = df['retained_earnings'] / df['total_assets']
+    x3 = df['ebit'] / df['total_assets']
+    x4 = df['market_cap'] / df['total_liabilities']
+    x5 = df['sales'] / df['total_assets']
+
+    z_score = 1.2*x1 + 1.4*x2 + 3.3*x3 + 0.6*x4 + 1.0*x5
+    zones = np.select([z_score > 2.99, z_score > 1.81], ["Safe", "Grey"], "Distress")
+
+    return pd.DataFrame({"z_score": z_score.round(2), "zone": zones})
+
+def calculate_altman_z_score(working_capital: float, retained_earnings: float,
+                             ebit: float, market_cap: float, sales: float,
                              total_assets: float, total_liabilities: float) -> dict:
     """Calculate Altman Z-Score for bankruptcy prediction"""
-    x1 = working_capital / total_assets
-    x2 = retained_earnings / total_assets  
-    x3 = ebit / total_assets
-    x4 = market_cap / total_liabilities
-    x5 = sales / total_assets
-    
-    z_score = 1.2*x1 + 1.4*x2 + 3.3*x3 + 0.6*x4 + 1.0*x5
-    
-    if z_score > 2.99:
-        zone = "Safe"
-    elif z_score > 1.81:
-        zone = "Grey"
-    else:
-        zone = "Distress"
-    
-    return {"z_score": round(z_score, 2), "zone": zone}
-
-def assess_credit_rating(debt_to_equity: float, debt_to_assets: float, 
+    result = altman_z_batch(pd.DataFrame([{
+        "working_capital": working_capital,
+        "retained_earnings": retained_earnings,
+        "ebit": ebit,
+        "market_cap": market_cap,
+        "sales": sales,
+        "total_assets": total_assets,
+        "total_liabilities": total_liabilities
+    }]))
+
+    return {"z_score": float(result["z_score"].iloc[0]),
+            "zone": str(result["zone"].iloc[0])}
+
+# Rating ladder as sorted threshold arrays: a company lands at the worst
+# rung demanded by either ratio
+_D2E_THRESHOLDS = np.array([0.3, 0.5, 1.0, 1.5, 2.0])
+_IC_THRESHOLDS = np.array([8, 6, 4, 2.5, 1.5])
+_RATINGS = np.array(["Aaa", "Aa", "A", "Baa", "Ba", "B"])
+_RISK_LEVELS = np.array(["Minimal", "Very Low", "Low", "Moderate", "Substantial", "High"])
+
+def assess_credit_rating_batch(debt_to_equity, interest_coverage) -> pd.DataFrame:
+    """Vectorized Moody's-style rating for arrays of ratios
+
+    Two branchless searchsorted lookups replace the if/elif ladder, so a
+    whole portfolio rates in one sweep.
+    """
+    d2e = np.atleast_1d(np.asarray(debt_to_equity, dtype=float))
+    ic = np.atleast_1d(np.asarray(interest_coverage, dtype=float))
+
+    idx = np.maximum(
+        np.searchsorted(_D2E_THRESHOLDS, d2e, side='right'),
+        np.searchsorted(-_IC_THRESHOLDS, -ic, side='right')
+    )
+
+    return pd.DataFrame({
+        "rating": _RATINGS[idx],
+        "risk_level": _RISK_LEVELS[idx],
+        "investment_grade": idx <= 3
+    })
+
+def assess_credit_rating(debt_to_equity: float, debt_to_assets: float,
                         interest_coverage: float) -> dict:
     """Moody's-style credit rating assessment"""
-    
-    # Investment grade thresholds
-    if debt_to_equity < 0.3 and interest_coverage > 8:
-        rating = "Aaa"
-        risk = "Minimal"
-    elif debt_to_equity < 0.5 and interest_coverage > 6:
-        rating = "Aa"
-        risk = "Very Low"
-    elif debt_to_equity < 1.0 and interest_coverage > 4:
-        rating = "A"
-        risk = "Low"
-    elif debt_to_equity < 1.5 and interest_coverage > 2.5:
-        rating = "Baa"
-        risk = "Moderate"
-    # Speculative grade
-    elif debt_to_equity < 2.0 and interest_coverage > 1.5:
-        rating = "Ba"
-        risk = "Substantial"
-    else:
-        rating = "B"
-        risk = "High"
-    
+    row = assess_credit_rating_batch([debt_to_equity], [interest_coverage]).iloc[0]
+
     return {
-        "rating": rating,
-        "risk_level": risk,
-        "investment_grade": rating in ["Aaa", "Aa", "A", "Baa"]
+        "rating": str(row["rating"]),
+        "risk_level": str(row["risk_level"]),
+        "investment_grade": bool(row["investment_grade"])
     }
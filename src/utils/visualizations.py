@@ -1,4 +1,7 @@
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # headless raster backend; no GUI event loop
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
@@ -16,83 +19,96 @@ class CreditVisualizer:
     """Generate visualizations from lakehouse data"""
     
     def __init__(self):
-        """Load data from lakehouse"""
+        """Connect to lakehouse"""
         self.lakehouse = CreditLakehouse()
-        self.df = self.lakehouse.read_all()
-        
-        if self.df.empty:
+
+        # Each plot projects just the columns it draws; here a one-column
+        # read is enough to check the table has data
+        if self.lakehouse.read_all(columns=['ticker']).empty:
             raise ValueError("No data in lakehouse. Run pipeline first.")
-        
+
         # Create output directory
         Path("outputs/charts").mkdir(parents=True, exist_ok=True)
     
-    def plot_debt_to_equity(self):
+    def plot_debt_to_equity(self, dpi: int = 150):
         """Horizontal bar chart of debt-to-equity ratios"""
-        plt.figure(figsize=(10, 6))
-        
+        fig, ax = plt.subplots(figsize=(10, 6))
+
+        df = self.lakehouse.read_all(columns=['ticker', 'debt_to_equity'])
+
         # Filter out zeros (missing data)
-        df_filtered = self.df[self.df['debt_to_equity'] > 0]
+        df_filtered = df[df['debt_to_equity'] > 0]
         df_sorted = df_filtered.sort_values('debt_to_equity', ascending=True)
-        
-        colors = ['red' if x > 100 else 'orange' if x > 50 else 'green' 
-                  for x in df_sorted['debt_to_equity']]
-        
-        plt.barh(df_sorted['ticker'], df_sorted['debt_to_equity'], color=colors, alpha=0.7)
-        plt.title('Debt-to-Equity Ratios by Company', fontsize=16, fontweight='bold')
-        plt.xlabel('Debt-to-Equity Ratio (%)', fontsize=12)
-        plt.ylabel('Company', fontsize=12)
-        plt.axvline(x=50, color='orange', linestyle='--', alpha=0.5, label='Moderate Risk (50)')
-        plt.axvline(x=100, color='red', linestyle='--', alpha=0.5, label='High Risk (100)')
-        plt.legend()
-        plt.grid(axis='x', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('outputs/charts/debt_to_equity.png', dpi=300, bbox_inches='tight')
+
+        # Vectorized threshold-to-color mapping
+        palette = np.array(['green', 'orange', 'red'])
+        colors = palette[np.searchsorted([50, 100], df_sorted['debt_to_equity'].to_numpy())]
+
+        ax.barh(df_sorted['ticker'], df_sorted['debt_to_equity'], color=colors, alpha=0.7)
+        ax.set_title('Debt-to-Equity Ratios by Company', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Debt-to-Equity Ratio (%)', fontsize=12)
+        ax.set_ylabel('Company', fontsize=12)
+        ax.axvline(x=50, color='orange', linestyle='--', alpha=0.5, label='Moderate Risk (50)')
+        ax.axvline(x=100, color='red', linestyle='--', alpha=0.5, label='High Risk (100)')
+        ax.legend()
+        ax.grid(axis='x', alpha=0.3)
+
+        fig.tight_layout()
+        fig.savefig('outputs/charts/debt_to_equity.png', dpi=dpi)
         print("✓ Saved: outputs/charts/debt_to_equity.png")
-        plt.close()
+        plt.close(fig)
     
-    def plot_return_on_equity(self):
+    def plot_return_on_equity(self, dpi: int = 150):
         """Bar chart of return on equity"""
-        plt.figure(figsize=(10, 6))
-        
+        fig, ax = plt.subplots(figsize=(10, 6))
+
+        df = self.lakehouse.read_all(columns=['ticker', 'return_on_equity'])
+
         # Filter out zeros
-        df_filtered = self.df[self.df['return_on_equity'] > 0]
+        df_filtered = df[df['return_on_equity'] > 0]
         df_sorted = df_filtered.sort_values('return_on_equity', ascending=False)
-        
+
         roe_pct = df_sorted['return_on_equity'] * 100
-        colors = ['green' if x > 15 else 'orange' if x > 10 else 'red' for x in roe_pct]
-        
-        plt.bar(df_sorted['ticker'], roe_pct, color=colors, alpha=0.7)
-        plt.title('Return on Equity by Company', fontsize=16, fontweight='bold')
-        plt.xlabel('Company', fontsize=12)
-        plt.ylabel('ROE (%)', fontsize=12)
-        plt.axhline(y=15, color='green', linestyle='--', alpha=0.5, label='Strong (>15%)')
-        plt.axhline(y=10, color='orange', linestyle='--', alpha=0.5, label='Adequate (>10%)')
-        plt.legend()
-        plt.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('outputs/charts/return_on_equity.png', dpi=300, bbox_inches='tight')
+
+        # Vectorized threshold-to-color mapping
+        palette = np.array(['red', 'orange', 'green'])
+        colors = palette[np.searchsorted([10, 15], roe_pct.to_numpy())]
+
+        ax.bar(df_sorted['ticker'], roe_pct, color=colors, alpha=0.7)
+        ax.set_title('Return on Equity by Company', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Company', fontsize=12)
+        ax.set_ylabel('ROE (%)', fontsize=12)
+        ax.axhline(y=15, color='green', linestyle='--', alpha=0.5, label='Strong (>15%)')
+        ax.axhline(y=10, color='orange', linestyle='--', alpha=0.5, label='Adequate (>10%)')
+        ax.legend()
+        ax.grid(axis='y', alpha=0.3)
+
+        fig.tight_layout()
+        fig.savefig('outputs/charts/return_on_equity.png', dpi=dpi)
         print("✓ Saved: outputs/charts/return_on_equity.png")
-        plt.close()
+        plt.close(fig)
     
-    def plot_debt_vs_cash(self):
+    def plot_debt_vs_cash(self, dpi: int = 150):
         """Scatter plot: total debt vs total cash"""
         plt.figure(figsize=(10, 8))
-        
+
+        df = self.lakehouse.read_all(columns=['ticker', 'total_debt', 'total_cash'])
+
         # Filter out zeros
-        df_filtered = self.df[(self.df['total_debt'] > 0) & (self.df['total_cash'] > 0)]
+        df_filtered = df[(df['total_debt'] > 0) & (df['total_cash'] > 0)]
         
         # Convert to billions
         debt_b = df_filtered['total_debt'] / 1e9
         cash_b = df_filtered['total_cash'] / 1e9
         
-        plt.scatter(cash_b, debt_b, s=300, alpha=0.6, c=range(len(df_filtered)), cmap='viridis')
-        
-        # Add company labels
-        for i, (idx, row) in enumerate(df_filtered.iterrows()):
-            plt.annotate(row['ticker'], (cash_b.iloc[i], debt_b.iloc[i]), 
-                        fontsize=12, fontweight='bold', ha='center')
+        ax = plt.gca()
+        ax.scatter(cash_b, debt_b, s=300, alpha=0.6, c=range(len(df_filtered)), cmap='viridis')
+
+        # Add company labels from the underlying arrays - iterrows boxes
+        # every row into a Series and is far slower
+        tickers = df_filtered['ticker'].to_numpy()
+        for ticker, x, y in zip(tickers, cash_b.to_numpy(), debt_b.to_numpy()):
+            ax.annotate(ticker, (x, y), fontsize=12, fontweight='bold', ha='center')
         
         plt.title('Debt vs Cash Position', fontsize=16, fontweight='bold')
         plt.xlabel('Total Cash (Billions USD)', fontsize=12)
@@ -105,7 +121,7 @@ class CreditVisualizer:
         plt.legend()
         
         plt.tight_layout()
-        plt.savefig('outputs/charts/debt_vs_cash.png', dpi=300, bbox_inches='tight')
+        plt.savefig('outputs/charts/debt_vs_cash.png', dpi=dpi)
         print("✓ Saved: outputs/charts/debt_vs_cash.png")
         plt.close()
     